@@ -1,5 +1,4 @@
 from enum import Enum
-import seaborn as sns
 import matplotlib.colors as clr
 
 
@@ -5,7 +5,7 @@ import warnings
 from enum import Enum
 
 from ..exceptions import ForecasterException, AbstractMethodException, IllegalArgument
-from ..utils.general import is_ordered_datetime, is_even_gap_datetime
+from ..utils.general import is_ordered_datetime, is_even_gap_datetime, cached_infer_freq
 from ..template.model_template import ModelTemplate
 from ..estimators.stan_estimator import StanEstimatorMCMC
 from ..constants.constants import TrainingMetaKeys, PredictionMetaKeys
@@ -400,7 +400,7 @@ class Forecaster(object):
         date_array = train_meta[TrainingMetaKeys.DATE_ARRAY.value]
         date_col = train_meta[TrainingMetaKeys.DATE_COL.value]
         train_end = date_array[len(date_array) - 1]
-        freq = pd.infer_freq(date_array)
+        freq = cached_infer_freq(date_array)
         future_date_array = pd.date_range(start=train_end, periods=periods + 1, freq=freq)[1:]
         future_df = pd.DataFrame(future_date_array).rename(columns={0: date_col})
 
@@ -33,14 +33,15 @@ def KTRLite(
     level_knot_dates : array like
         list of pre-specified dates for the level knots
     seasonality : int, or list of int
-        multiple seasonality
+        multiple seasonality; tuple or array of int is also accepted
     seasonality_fs_order : int, or list of int
-        fourier series order for seasonality
+        fourier series order for seasonality; a single int is applied to every seasonality; default to be 2.
+        2 * order must not exceed seasonality - 1 to avoid over-fitting
     seasonality_segments : int
         the number of segments partitioned by the knots of seasonality
-    seasonal_initial_knot_scale : float
+    seasonal_initial_knot_scale : float, or list of float
         scale parameter for seasonal regressors initial coefficient knots; default to be 1
-    seasonal_knot_scale : float
+    seasonal_knot_scale : float, or list of float
         scale parameter for seasonal regressors drift of coefficient knots; default to be 0.1.
     degree_of_freedom : int
         degree of freedom for error t-distribution
@@ -1,11 +1,9 @@
 import numpy as np
 import pandas as pd
+from functools import lru_cache
+from typing import NamedTuple
 from copy import deepcopy
-import torch
 from enum import Enum
-import math
-from scipy.stats import nct
-import matplotlib.pyplot as plt
 
 from ..constants.constants import (
     PredictionKeys,
@@ -17,15 +15,16 @@ from ..exceptions import IllegalArgument, ModelException
 from .model_template import ModelTemplate
 from ..estimators.stan_estimator import StanEstimatorMAP
 from ..utils.kernels import sandwich_kernel
-from ..utils.features import make_fourier_series_df
 from orbit.constants.palette import OrbitPalette
 from ..utils.knots import get_knot_idx, get_knot_dates
+from ..utils.general import cached_infer_freq
 from ..utils.plot import orbit_style_decorator
 
 
-class DataInputMapper(Enum):
+class DataInputMapper(str, Enum):
     """
-    mapping from object input to pyro input
+    mapping from object input to pyro input; members compare and hash equal to their values, but use `.value`
+    where the string itself is needed since str()/format() of a member differs across python versions
     """
     # All of the following have default defined in DEFAULT_SLGT_FIT_ATTRIBUTES
     # ----------  Data Input ---------- #
@@ -47,7 +46,7 @@ class DataInputMapper(Enum):
     COEFFICIENTS_KNOT_SCALE = 'COEF_KNOT_SCALE'
 
 
-class BaseSamplingParameters(Enum):
+class BaseSamplingParameters(str, Enum):
     """
     The output sampling parameters related with base model.
     """
@@ -57,7 +56,7 @@ class BaseSamplingParameters(Enum):
     OBS_SCALE = 'obs_scale'
 
 
-class RegressionSamplingParameters(Enum):
+class RegressionSamplingParameters(str, Enum):
     """
     The output sampling parameters related with regression component.
     """
@@ -65,6 +64,23 @@ class RegressionSamplingParameters(Enum):
     COEFFICIENTS = 'coef'
 
 
+class KTRLiteState(NamedTuple):
+    """
+    Knots and kernel arrays derived in the fitting process of KTRLite
+    """
+    knots_tp_level: np.ndarray
+    kernel_level: np.ndarray
+    num_knots_level: int
+    knots_tp_coefficients: np.ndarray
+    kernel_coefficients: np.ndarray
+    num_knots_coefficients: int
+
+
+def _kernel_state_property(name):
+    """read-only attribute delegated to the fitted :class:`KTRLiteState`; None before fitting"""
+    return property(lambda self: getattr(self._kernel_state, name, None))
+
+
 class KTRLiteInitializer(object):
     def __init__(self, num_regressor, num_knots_coefficients):
         self.num_regressor = num_regressor
@@ -79,6 +95,104 @@ class KTRLiteInitializer(object):
         return init_values
 
 
+# each entry holds an n x (2 * order) array; keep only the few needed by repeated fit/predict on the same
+# data (one per seasonality, for training and prediction) so memory stays bounded on long series
+@lru_cache(maxsize=8)
+def _fourier_basis(n, shift, period, order):
+    """ Cached fourier series basis of a single seasonality used by KTRLite. Call `_fourier_basis.cache_clear()`
+    to release the cached arrays.
+
+    Parameters
+    ----------
+    n : int
+        length of time series
+    shift : int
+        shift of time step/index to generate the series
+    period : int or float
+        length of a cyclical period
+    order : int
+        number of components for each sin() or cos() series
+
+    Returns
+    -------
+    np.ndarray
+        read-only 2D array with size n x (2 * order) where columns are interleaved as cos1, sin1, cos2, sin2, ...
+    """
+    t = np.arange(1, n + 1, dtype=np.double) + shift
+    x = (2.0 * np.pi / period) * np.outer(t, np.arange(1, order + 1))
+    out = np.empty((n, 2 * order), dtype=np.double)
+    out[:, 0::2] = np.cos(x)
+    out[:, 1::2] = np.sin(x)
+    # shared across calls; protect the cached array from in-place modification
+    out.setflags(write=False)
+    return out
+
+
+def _compute_knots_tp(num_of_observations, num_of_segments=None, knot_distance=None, date_array=None,
+                      knot_dates=None):
+    """ Derive knot indices and their normalized time points shared by level and seasonality knots.
+
+    Parameters
+    ----------
+    num_of_observations : int
+        number of observations used in training
+    num_of_segments, knot_distance, date_array, knot_dates :
+        see :func:`orbit.utils.knots.get_knot_idx`
+
+    Returns
+    -------
+    knots_idx : np.ndarray
+        1D array of knot indices (starts at 0)
+    knots_tp : np.ndarray
+        1D contiguous float64 array of knot time points normalized by number of observations
+    """
+    knots_idx = get_knot_idx(
+        num_of_obs=num_of_observations,
+        num_of_segments=num_of_segments,
+        knot_distance=knot_distance,
+        date_array=date_array,
+        knot_dates=knot_dates,
+    )
+    # knot_idx starts with 0; add 1 to calculate the fraction
+    knots_tp = np.ascontiguousarray((1 + knots_idx) / num_of_observations, dtype=np.double)
+    return knots_idx, knots_tp
+
+
+def _scan_response(response, max_seasonality):
+    """ Derive response offset along with valid (non-NaN) response mask and indices.
+
+    Parameters
+    ----------
+    response : array-like
+        1D response array which may contain NaN
+    max_seasonality : int
+        number of leading observations used to compute the offset
+
+    Returns
+    -------
+    offset : float
+        mean of the valid response within the first `max_seasonality` observations
+    is_valid : np.ndarray
+        1D boolean array indicating non-NaN response
+    which_valid : np.ndarray
+        1D integer array of indices of the valid response
+    num_of_valid : int
+        number of valid response
+    """
+    offset = np.nanmean(response[:max_seasonality])
+    is_valid = ~np.isnan(response)
+    # [0] to convert tuple back to array
+    which_valid = np.where(is_valid)[0]
+    return offset, is_valid, which_valid, len(which_valid)
+
+
+def _broadcast_scalar_or_list(x, n):
+    """return a list copy of x if it is list-like; otherwise repeat the scalar x n times"""
+    if isinstance(x, (list, tuple, np.ndarray)):
+        return list(x)
+    return [x] * n
+
+
 class KTRLiteModel(ModelTemplate):
     """
     Parameters
@@ -92,15 +206,16 @@ class KTRLiteModel(ModelTemplate):
     level_knot_dates : array like
         list of pre-specified dates for the level knots
     seasonality : int, or list of int
-        multiple seasonality
+        multiple seasonality; tuple or array of int is also accepted
     seasonality_fs_order : int, or list of int
-        fourier series order for seasonality
+        fourier series order for seasonality; a single int is applied to every seasonality; default to be 2.
+        2 * order must not exceed seasonality - 1 to avoid over-fitting
     seasonality_segments : int
         the number of segments partitioned by the knots of seasonality; when it is 0, returns to a static coefficients
         of regression used in the seasonality estimation
-    seasonal_initial_knot_scale : float
+    seasonal_initial_knot_scale : float, or list of float
         scale parameter for seasonal regressors initial coefficient knots; default to be 1
-    seasonal_knot_scale : float
+    seasonal_knot_scale : float, or list of float
         scale parameter for seasonal regressors drift of coefficient knots; default to be 0.1.
     degree_of_freedom : int
         degree of freedom for error t-distribution
@@ -111,6 +226,14 @@ class KTRLiteModel(ModelTemplate):
     _model_name = 'ktrlite'
     _supported_estimator_types = [StanEstimatorMAP]
 
+    # kernel related attributes are held by KTRLiteState; exposed as attributes for the data input mapper
+    knots_tp_level = _kernel_state_property('knots_tp_level')
+    kernel_level = _kernel_state_property('kernel_level')
+    num_knots_level = _kernel_state_property('num_knots_level')
+    knots_tp_coefficients = _kernel_state_property('knots_tp_coefficients')
+    kernel_coefficients = _kernel_state_property('kernel_coefficients')
+    num_knots_coefficients = _kernel_state_property('num_knots_coefficients')
+
     def __init__(
             self,
             # level
@@ -168,19 +291,25 @@ class KTRLiteModel(ModelTemplate):
         # basic response fields
         # mainly set by ._set_dynamic_attributes()
         self.response_offset = 0
-        self.is_valid_response = None
+        # valid response mask is stored bit-packed; see .is_valid_response
+        self._is_valid_response_packed = None
+        self._num_of_observations = 0
         self.which_valid_response = None
         self.num_of_valid_response = 0
 
-        self.num_knots_level = None
-        self.knots_tp_level = None
-
-        self.num_knots_coefficients = None
-        self.knots_tp_coefficients = None
+        # knots and kernel matrices; set by ._set_kernel_matrix()
+        self._kernel_state = None
         self.regressor_matrix = None
         # self.coefficients_knot_dates = None
         self._set_model_param_names()
 
+    @property
+    def is_valid_response(self):
+        """boolean mask of non-NaN response; unpacked on demand from its bit-packed storage"""
+        if self._is_valid_response_packed is None:
+            return None
+        return np.unpackbits(self._is_valid_response_packed, count=self._num_of_observations).astype(bool)
+
     def set_init_values(self):
         """Override function from Base Template"""
         # init_values_partial = partial(init_values_callable, seasonality=seasonality)
@@ -197,32 +326,24 @@ class KTRLiteModel(ModelTemplate):
         if self.seasonality is None:
             self._seasonality = list()
             self._seasonality_fs_order = list()
-        elif not isinstance(self._seasonality, list) and isinstance(self._seasonality, (int, float)):
-            self._seasonality = [self.seasonality]
+        else:
+            self._seasonality = _broadcast_scalar_or_list(self.seasonality, 1)
+        num_of_seasonality = len(self._seasonality)
 
         # set some defaults for seasonality_fs_order
-        if self._seasonality and self._seasonality_fs_order is None:
-            self._seasonality_fs_order = [2] * len(self._seasonality)
-        elif not isinstance(self._seasonality_fs_order, list) and isinstance(self._seasonality_fs_order, (int, float)):
-            self._seasonality_fs_order = [self.seasonality_fs_order]
+        if self._seasonality_fs_order is None:
+            self._seasonality_fs_order = 2
+        self._seasonality_fs_order = _broadcast_scalar_or_list(self._seasonality_fs_order, num_of_seasonality)
 
-        if len(self._seasonality_fs_order) != len(self._seasonality):
+        if len(self._seasonality_fs_order) != num_of_seasonality:
             raise IllegalArgument('length of seasonality and fs_order not matching')
 
-        for k, order in enumerate(self._seasonality_fs_order):
-            if 2 * order > self._seasonality[k] - 1:
-                raise IllegalArgument('reduce seasonality_fs_order to avoid over-fitting')
+        if np.any(2 * np.asarray(self._seasonality_fs_order) > np.asarray(self._seasonality) - 1):
+            raise IllegalArgument('reduce seasonality_fs_order to avoid over-fitting')
 
-        if not isinstance(self.seasonal_initial_knot_scale, list) and \
-                isinstance(self.seasonal_initial_knot_scale * 1.0, float):
-            self._seasonal_initial_knot_scale = [self.seasonal_initial_knot_scale] * len(self._seasonality)
-        else:
-            self._seasonal_initial_knot_scale = self.seasonal_initial_knot_scale
-
-        if not isinstance(self.seasonal_knot_scale, list) and isinstance(self.seasonal_knot_scale * 1.0, float):
-            self._seasonal_knot_scale = [self.seasonal_knot_scale] * len(self._seasonality)
-        else:
-            self._seasonal_knot_scale = self.seasonal_knot_scale
+        self._seasonal_initial_knot_scale = _broadcast_scalar_or_list(
+            self.seasonal_initial_knot_scale, num_of_seasonality)
+        self._seasonal_knot_scale = _broadcast_scalar_or_list(self.seasonal_knot_scale, num_of_seasonality)
 
     def _set_seasonality_attributes(self):
         """given list of seasonalities and their order, create list of seasonal_regressors_columns"""
@@ -233,13 +354,11 @@ class KTRLiteModel(ModelTemplate):
 
         if len(self._seasonality) > 0:
             for idx, s in enumerate(self._seasonality):
-                fs_cols = []
                 order = self._seasonality_fs_order[idx]
                 self.coefficients_initial_knot_scale += [self._seasonal_initial_knot_scale[idx]] * order * 2
                 self.coefficients_knot_scale += [self._seasonal_knot_scale[idx]] * order * 2
-                for i in range(1, order + 1):
-                    fs_cols.append('seas{}_fs_cos{}'.format(s, i))
-                    fs_cols.append('seas{}_fs_sin{}'.format(s, i))
+                prefix = f'seas{s}_fs_'
+                fs_cols = [f'{prefix}{fs}{i}' for i in range(1, order + 1) for fs in ('cos', 'sin')]
                 # flatten version of regressor columns
                 self.regressor_col += fs_cols
                 # list of group of regressor columns bundled with seasonality
@@ -253,47 +372,44 @@ class KTRLiteModel(ModelTemplate):
         response = training_meta[TrainingMetaKeys.RESPONSE.value]
         num_of_observations = training_meta[TrainingMetaKeys.NUM_OF_OBS.value]
 
+        # get some reasonable offset to regularize response to make default priors scale-insensitive
         if self._seasonality:
-            max_seasonality = np.round(np.max(self._seasonality)).astype(int)
+            max_seasonality = int(round(max(self._seasonality)))
             if num_of_observations < max_seasonality:
                 raise ModelException(
                     "Number of observations {} is less than max seasonality {}".format(
                         num_of_observations, max_seasonality))
-        # get some reasonable offset to regularize response to make default priors scale-insensitive
-        if self._seasonality:
-            max_seasonality = np.round(np.max(self._seasonality)).astype(int)
-            self.response_offset = np.nanmean(response[:max_seasonality])
         else:
-            self.response_offset = np.nanmean(response)
+            max_seasonality = num_of_observations
 
-        self.is_valid_response = ~np.isnan(response)
-        # [0] to convert tuple back to array
-        self.which_valid_response = np.where(self.is_valid_response)[0]
-        self.num_of_valid_response = len(self.which_valid_response)
+        # offset, valid response mask and indices
+        self.response_offset, is_valid_response, self.which_valid_response, self.num_of_valid_response = \
+            _scan_response(response, max_seasonality)
+        self._is_valid_response_packed = np.packbits(is_valid_response)
+        self._num_of_observations = num_of_observations
 
-    def _make_seasonal_regressors(self, df, shift):
+    def _build_regressor_matrix(self, num_of_observations, shift):
         """
-        df : pd.DataFrame
+        num_of_observations : int
         shift: int
             use 0 for fitting; use delta of prediction start and train start for prediction
         Returns
         -------
-        pd.DataFrame
-            data with computed fourier series attached
+        np.ndarray
+            2D array of fourier series regressors with columns ordered as `regressor_col`
         """
-        if len(self._seasonality) > 0:
-            for idx, s in enumerate(self._seasonality):
-                order = self._seasonality_fs_order[idx]
-                df, _ = make_fourier_series_df(df, s, order=order, prefix='seas{}_'.format(s), shift=shift)
+        if self.num_of_regressors > 0:
+            return np.concatenate([
+                _fourier_basis(num_of_observations, shift, s, self._seasonality_fs_order[idx])
+                for idx, s in enumerate(self._seasonality)
+            ], axis=1)
 
-        return df
+        return np.zeros((num_of_observations, 0), dtype=np.double)
 
     def _set_regressor_matrix(self, df, training_meta):
         num_of_observations = training_meta[TrainingMetaKeys.NUM_OF_OBS.value]
-        # init of regression matrix depends on length of response vector
-        self.regressor_matrix = np.zeros((num_of_observations, 0), dtype=np.double)
-        if self.num_of_regressors > 0:
-            self.regressor_matrix = df.filter(items=self.regressor_col, ).values
+        # fourier series are filled into the regressor matrix directly without attaching to df
+        self.regressor_matrix = self._build_regressor_matrix(num_of_observations, shift=0)
 
     def _set_kernel_matrix(self, df, training_meta):
         """ set all kernel related metrics
@@ -302,6 +418,7 @@ class KTRLiteModel(ModelTemplate):
         3. kernel matrix (kernel)
         4. knot dates (knot_dates) based on frequency implied from df
         5. do the same on regression (seasonality regression) if regressors are available
+        knots and kernel arrays are stored as a KTRLiteState in `_kernel_state`
 
         Parameters
         ----------
@@ -311,8 +428,8 @@ class KTRLiteModel(ModelTemplate):
         num_of_observations = training_meta[TrainingMetaKeys.NUM_OF_OBS.value]
         date_array = training_meta[TrainingMetaKeys.DATE_ARRAY.value]
 
-        self._level_knots_idx = get_knot_idx(
-            num_of_obs=num_of_observations,
+        self._level_knots_idx, knots_tp_level = _compute_knots_tp(
+            num_of_observations,
             knot_distance=self.level_knot_distance,
             num_of_segments=self.level_segments,
             date_array=date_array,
@@ -320,41 +437,39 @@ class KTRLiteModel(ModelTemplate):
         )
         # kernel of coefficients calculations
         # set some default
-        self.kernel_coefficients = np.zeros((num_of_observations, 0), dtype=np.double)
-        self.num_knots_coefficients = 0
-
-        if self.num_of_regressors > 0:
-            self._seas_knots_idx = get_knot_idx(
-                date_array=None,
-                num_of_obs=num_of_observations,
-                knot_dates=None,
-                knot_distance=None,
-                num_of_segments=self.seasonality_segments,
-            )
+        knots_tp_coefficients = None
+        kernel_coefficients = np.zeros((num_of_observations, 0), dtype=np.double)
 
         tp = np.arange(1, num_of_observations + 1) / num_of_observations
-        self.knots_tp_level = (1 + self._level_knots_idx) / num_of_observations
-        self.kernel_level = sandwich_kernel(tp, self.knots_tp_level)
-        self.num_knots_level = len(self.knots_tp_level)
+        kernel_level = sandwich_kernel(tp, knots_tp_level)
         if self.date_freq is None:
-            self.date_freq = pd.infer_freq(date_array)
+            self.date_freq = cached_infer_freq(date_array)
             # self.time_delta = date_array.diff().min()
         self._level_knot_dates = get_knot_dates(date_array[0], self._level_knots_idx, self.date_freq)
 
         # update rest of the seasonality related fields
         if self.num_of_regressors > 0:
-            self.knots_tp_coefficients = (1 + self._seas_knots_idx) / num_of_observations
-            self.kernel_coefficients = sandwich_kernel(tp, self.knots_tp_coefficients)
-            self.num_knots_coefficients = len(self.knots_tp_coefficients)
+            self._seas_knots_idx, knots_tp_coefficients = _compute_knots_tp(
+                num_of_observations,
+                num_of_segments=self.seasonality_segments,
+            )
+            kernel_coefficients = sandwich_kernel(tp, knots_tp_coefficients)
             self._coef_knot_dates = get_knot_dates(date_array[0], self._seas_knots_idx, self.date_freq)
 
+        self._kernel_state = KTRLiteState(
+            knots_tp_level=knots_tp_level,
+            kernel_level=kernel_level,
+            num_knots_level=len(knots_tp_level),
+            knots_tp_coefficients=knots_tp_coefficients,
+            kernel_coefficients=kernel_coefficients,
+            num_knots_coefficients=len(knots_tp_coefficients) if knots_tp_coefficients is not None else 0,
+        )
+
     def set_dynamic_attributes(self, df, training_meta):
         """Overriding the parent class to customize pre-processing in fitting process"""
         # extra settings and validation for KTRLite
         self._set_validate_ktr_params(training_meta)
-        # attach fourier series as regressors
-        df = self._make_seasonal_regressors(df, shift=0)
-        # set regressors as input matrix and derive kernels
+        # set fourier series as regressors input matrix and derive kernels
         self._set_regressor_matrix(df, training_meta)
         self._set_kernel_matrix(df, training_meta)
 
@@ -431,19 +546,20 @@ class KTRLiteModel(ModelTemplate):
         seas_decomp = {}
         # update seasonal regression matrices
         if self._seasonality and self.regressor_col:
-            df = self._make_seasonal_regressors(df, shift=start)
+            regressor_matrix = self._build_regressor_matrix(df.shape[0], shift=start)
             coef_knot = model.get(RegressionSamplingParameters.COEFFICIENTS_KNOT.value)
             kernel_coefficients = sandwich_kernel(new_tp, self.knots_tp_coefficients)
             coef = np.matmul(coef_knot, kernel_coefficients.transpose(1, 0))
             pos = 0
             for idx, cols in enumerate(self.regressor_col_grp):
-                seasonal_regressor_matrix = df[cols].values
+                seasonal_regressor_matrix = regressor_matrix[:, pos:(pos + len(cols))]
                 seas_coef = coef[..., pos:(pos + len(cols)), :]
                 seas_regression = np.sum(seas_coef * seasonal_regressor_matrix.transpose(1, 0), axis=-2)
                 seas_decomp['seasonality_{}'.format(self._seasonality[idx])] = seas_regression
                 pos += len(cols)
                 total_seas_regression += seas_regression
         if include_error:
+            from scipy.stats import nct
             epsilon = nct.rvs(self._degree_of_freedom, nc=0, loc=0,
                               scale=obs_scale, size=(num_sample, len(new_tp)))
             pred_array = trend + total_seas_regression + epsilon
@@ -512,6 +628,8 @@ class KTRLiteModel(ModelTemplate):
         -------
             matplotlib axes object
         """
+        import matplotlib.pyplot as plt
+
         date_col = training_meta[TrainingMetaKeys.DATE_COL.value]
         date_array = training_meta[TrainingMetaKeys.DATE_ARRAY.value]
         response = training_meta[TrainingMetaKeys.RESPONSE.value]
@@ -17,10 +17,39 @@ def is_ordered_datetime(array):
     return np.all(np.diff(array).astype(float) > 0)
 
 
+# inferred frequencies keyed by date array contents; see cached_infer_freq()
+_INFERRED_FREQ_CACHE = dict()
+_INFERRED_FREQ_CACHE_SIZE = 128
+
+
+def cached_infer_freq(array):
+    """ Same as `pd.infer_freq` but with results cached across calls (e.g. repeated fits on the same dates)
+
+    Parameters
+    ----------
+    array : datetime array-like
+
+    Returns
+    -------
+    str or None
+        inferred frequency; None if no discernible frequency
+    """
+    dates = pd.DatetimeIndex(array)
+    # key on the exact contents; the dtype carries the unit and tz since the same instants can infer
+    # differently with and without a tz (e.g. daily local dates across a DST switch)
+    key = (str(dates.dtype), len(dates), hash(dates.asi8.tobytes()))
+    if key not in _INFERRED_FREQ_CACHE:
+        if len(_INFERRED_FREQ_CACHE) >= _INFERRED_FREQ_CACHE_SIZE:
+            # drop the oldest entry
+            _INFERRED_FREQ_CACHE.pop(next(iter(_INFERRED_FREQ_CACHE)))
+        _INFERRED_FREQ_CACHE[key] = pd.infer_freq(array)
+    return _INFERRED_FREQ_CACHE[key]
+
+
 def is_even_gap_datetime(array):
     """Returns True if array is evenly distributed"""
     if len(array) >= 3:
-        return isinstance(pd.infer_freq(array), str)
+        return isinstance(cached_infer_freq(array), str)
     return True
 
 
@@ -81,26 +81,26 @@ def sandwich_kernel(x, x_i):
     1. https://mc-stan.org/docs/2_24/stan-users-guide/gaussian-process-regression.html
     2. https://en.wikipedia.org/wiki/Local_regression
     """
+    # knots `x_i` are assumed to be sorted
+    x = np.asarray(x, dtype=np.double)
+    x_i = np.asarray(x_i, dtype=np.double)
     N = len(x)
     M = len(x_i)
     k = np.zeros((N, M), dtype=np.double)
 
-    np_idx = np.where(x < x_i[0])
-    k[np_idx, 0] = 1
-
-    for m in range(M - 1):
-        np_idx = np.where(np.logical_and(x >= x_i[m], x < x_i[m + 1]))
-        total_dist = x_i[m + 1] - x_i[m]
-        backward_dist = x[np_idx] - x_i[m]
-        forward_dist = x_i[m + 1] - x[np_idx]
-        k[np_idx, m] = forward_dist / total_dist
-        k[np_idx, m + 1] = backward_dist / total_dist
-
-    np_idx = np.where(x >= x_i[M - 1])
-    k[np_idx, M - 1] = 1
-
-    # TODO: it is probably not needed
-    k = k / np.sum(k, axis=1, keepdims=True)
+    # boundary cases
+    is_before = x < x_i[0]
+    is_after = x >= x_i[M - 1]
+    k[is_before, 0] = 1
+    k[is_after, M - 1] = 1
+
+    # locate the bracketing knots of all inner points at once
+    rows = np.where(~(is_before | is_after))[0]
+    x_in = x[rows]
+    m = np.searchsorted(x_i, x_in, side='right') - 1
+    total_dist = x_i[m + 1] - x_i[m]
+    k[rows, m] = (x_i[m + 1] - x_in) / total_dist
+    k[rows, m + 1] = (x_in - x_i[m]) / total_dist
 
     return k
 
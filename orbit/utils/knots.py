@@ -34,9 +34,13 @@ def get_dates_delta(start_date, end_date, time_delta):
     end_date : numpy datetime array
     time_delta : time delta between dates
     """
-    date_diff = end_date - start_date
+    # work on int64 nanoseconds so the difference and division are plain vectorized numpy operations
+    start_ns = np.asarray(start_date, dtype='datetime64[ns]').view('i8')
+    end_ns = np.asarray(end_date, dtype='datetime64[ns]').view('i8')
+    delta_ns = np.asarray(time_delta, dtype='timedelta64[ns]').view('i8')
+    date_diff = (end_ns - start_ns) / delta_ns
     # can also be deemed as the "knot_idx"
-    norm_delta = np.round(date_diff / time_delta).astype(int)
+    norm_delta = np.round(date_diff).astype(int)
 
     return norm_delta
 
@@ -45,7 +49,11 @@ def get_knot_idx_by_dist(num_of_obs, knot_distance):
     """function to calculate the knot idx based on num_of_obs and knot_distance."""
     # starts with the the ending point
     # use negative values or simply append 0 to the sequence?
-    knot_idx = np.sort(np.arange(num_of_obs - 1, -1, -knot_distance))
+    # same points as np.arange(num_of_obs - 1, -1, -knot_distance) but generated in ascending order without sorting
+    num_of_knots = int(np.ceil(num_of_obs / knot_distance))
+    # step derived the same way np.arange does to keep identical rounding of the knot locations
+    step = ((num_of_obs - 1) - knot_distance) - (num_of_obs - 1)
+    knot_idx = (num_of_obs - 1) + np.arange(num_of_knots - 1, -1, -1) * step
     knot_idx = np.round(knot_idx).astype('int')
     if 0 not in knot_idx:
         # knot_idx = np.sort(np.arange(num_of_obs - 1, -1 - knot_distance, -knot_distance))
@@ -96,13 +104,11 @@ def get_knot_idx(
     if knot_dates is not None:
         if date_array is None:
             raise IllegalArgument('When knot_dates are supplied, users need to supply date_array as well.')
-        knot_dates = np.array(knot_dates, dtype='datetime64')
+        knot_dates = np.array(knot_dates, dtype='datetime64[ns]')
+        date_values = np.asarray(date_array, dtype='datetime64[ns]')
 
         # filter out
-        _knot_dates = pd.to_datetime([
-            x for x in knot_dates if
-            (x <= date_array.max()) and (x >= date_array.min())
-        ])
+        _knot_dates = knot_dates[(knot_dates <= date_values.max()) & (knot_dates >= date_values.min())]
 
         time_delta = date_array.diff().mean()
 
@@ -1,7 +1,6 @@
 import pkg_resources
 import functools
 import logging
-from matplotlib import pyplot as plt
 
 STYLE_FILE_NAME = 'plot_style'
 
@@ -26,6 +25,8 @@ def orbit_style_decorator(func):
 
         # use orbit style plot if it is set to be True
         if use_orbit_style:
+            # import lazily so that modules using this decorator do not pull in matplotlib at import time
+            from matplotlib import pyplot as plt
             orbit_style_path = get_orbit_style()
             try:
                 with plt.style.context(orbit_style_path):
@@ -3,6 +3,8 @@ import numpy as np
 import pandas as pd
 
 from orbit.models import KTRLite
+from orbit.template.ktrlite import _scan_response
+from orbit.exceptions import IllegalArgument
 from orbit.diagnostics.metrics import smape
 
 # used for in-sample training insanity check
@@ -306,3 +308,70 @@ def test_ktrlite_hourly_data(ca_hourly_electricity_data):
     assert len(ktrlite._posterior_samples) == expected_num_parameters
     smape_val = smape(train_df['SDGE'].values, predict_df['prediction'].values)
     assert smape_val <= SMAPE_TOLERANCE
+
+
+@pytest.mark.parametrize(
+    "response, max_seasonality, expected_offset, expected_which_valid",
+    [
+        (np.array([1.0, 2.0, 3.0, 6.0]), 4, 3.0, [0, 1, 2, 3]),
+        (np.array([1.0, np.nan, 3.0, 10.0, np.nan]), 3, 2.0, [0, 2, 3]),
+        (np.array([np.nan, np.nan, np.nan]), 3, np.nan, []),
+    ],
+    ids=['no_seasonality', 'nan_within_seasonality', 'all_nan']
+)
+@pytest.mark.filterwarnings("ignore:Mean of empty slice")
+def test_ktrlite_scan_response(response, max_seasonality, expected_offset, expected_which_valid):
+    offset, is_valid, which_valid, num_of_valid = _scan_response(response, max_seasonality)
+
+    if np.isnan(expected_offset):
+        assert np.isnan(offset)
+    else:
+        assert offset == pytest.approx(expected_offset)
+    assert np.all(is_valid == ~np.isnan(response))
+    assert which_valid.tolist() == expected_which_valid
+    assert num_of_valid == len(expected_which_valid)
+
+
+@pytest.mark.parametrize(
+    "seasonality, seasonality_fs_order, expected_fs_order",
+    [
+        ([7, 365.25], 2, [2, 2]),
+        ([7, 365.25], None, [2, 2]),
+        ((7, 365.25), np.array([3, 5]), [3, 5]),
+        (7, 3, [3]),
+    ],
+    ids=['scalar_order', 'default_order', 'array_like', 'scalar_seasonality']
+)
+def test_ktrlite_seasonality_fs_order_args(seasonality, seasonality_fs_order, expected_fs_order):
+    ktrlite = KTRLite(
+        response_col='response',
+        date_col='date',
+        seasonality=seasonality,
+        seasonality_fs_order=seasonality_fs_order,
+        estimator='stan-map',
+    )
+    model = ktrlite._model
+
+    assert model._seasonality_fs_order == expected_fs_order
+    assert model.num_of_regressors == 2 * sum(expected_fs_order)
+    assert len(model.coefficients_knot_scale) == model.num_of_regressors
+
+
+@pytest.mark.parametrize(
+    "seasonality, seasonality_fs_order",
+    [
+        ([7, 365.25], [4, 2]),
+        (7, 4),
+        ([7, 365.25], [2]),
+    ],
+    ids=['over_fitting_list', 'over_fitting_scalar', 'length_mismatch']
+)
+def test_ktrlite_seasonality_fs_order_illegal(seasonality, seasonality_fs_order):
+    with pytest.raises(IllegalArgument):
+        KTRLite(
+            response_col='response',
+            date_col='date',
+            seasonality=seasonality,
+            seasonality_fs_order=seasonality_fs_order,
+            estimator='stan-map',
+        )
@@ -0,0 +1,58 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+from orbit.utils import general
+from orbit.utils.general import cached_infer_freq, is_even_gap_datetime
+
+
+@pytest.fixture
+def infer_freq_calls(monkeypatch):
+    """clear the frequency cache and count calls of pd.infer_freq made through it"""
+    monkeypatch.setattr(general, '_INFERRED_FREQ_CACHE', dict())
+    calls = list()
+    infer_freq = pd.infer_freq
+
+    def counted_infer_freq(array):
+        calls.append(1)
+        return infer_freq(array)
+
+    monkeypatch.setattr(general.pd, 'infer_freq', counted_infer_freq)
+    return calls
+
+
+@pytest.mark.parametrize("freq", ['D', 'W-SUN', 'MS'])
+def test_cached_infer_freq_hit(infer_freq_calls, freq):
+    date_array = pd.Series(pd.date_range('2020-01-01', periods=50, freq=freq))
+
+    assert cached_infer_freq(date_array) == freq
+    assert cached_infer_freq(date_array.copy()) == freq
+    assert len(infer_freq_calls) == 1
+
+
+@pytest.mark.parametrize("regular_first", [True, False])
+def test_cached_infer_freq_irregular(infer_freq_calls, regular_first):
+    regular = pd.Series(pd.date_range('2020-01-01', periods=5, freq='D'))
+    # same first date, last date, length and sum of timestamps as the regular series
+    irregular = regular.copy()
+    irregular[1] -= pd.Timedelta(hours=1)
+    irregular[2] += pd.Timedelta(hours=1)
+
+    arrays = [(regular, 'D'), (irregular, None)]
+    for date_array, expected in (arrays if regular_first else arrays[::-1]):
+        assert cached_infer_freq(date_array) == expected
+    assert is_even_gap_datetime(regular)
+    assert not is_even_gap_datetime(irregular)
+    assert len(infer_freq_calls) == 2
+
+
+@pytest.mark.parametrize("local_first", [True, False])
+def test_cached_infer_freq_tz(infer_freq_calls, local_first):
+    # daily local dates across the 2021 DST switch; the same instants in naive UTC are not evenly spaced
+    local = pd.Series(pd.date_range('2021-03-10', periods=7, freq='D', tz='US/Eastern'))
+    utc = local.dt.tz_convert('UTC').dt.tz_localize(None)
+
+    arrays = [(local, 'D'), (utc, None)]
+    for date_array, expected in (arrays if local_first else arrays[::-1]):
+        assert cached_infer_freq(date_array) == expected
+    assert len(infer_freq_calls) == 2
@@ -0,0 +1,37 @@
+import pytest
+import numpy as np
+from orbit.utils.kernels import sandwich_kernel
+
+
+@pytest.mark.parametrize(
+    "num_of_obs, knots_tp", [
+        (10, np.array([0.1])),
+        (100, np.array([0.01, 0.5, 1.0])),
+        (365, np.linspace(0.1, 0.9, 11)),
+    ]
+)
+def test_sandwich_kernel_shape(num_of_obs, knots_tp):
+    # include out-of-sample time points as well
+    tp = np.arange(1, int(num_of_obs * 1.2) + 1) / num_of_obs
+    k = sandwich_kernel(tp, knots_tp)
+
+    assert k.shape == (len(tp), len(knots_tp))
+    assert np.all(k >= 0)
+    assert np.allclose(np.sum(k, axis=1), 1.0)
+
+
+def test_sandwich_kernel_weights():
+    tp = np.array([0.0, 0.1, 0.25, 0.5, 0.9, 1.0, 1.2])
+    knots_tp = np.array([0.1, 0.5, 1.0])
+    expected = np.array([
+        [1.0, 0.0, 0.0],
+        [1.0, 0.0, 0.0],
+        [0.625, 0.375, 0.0],
+        [0.0, 1.0, 0.0],
+        [0.0, 0.2, 0.8],
+        [0.0, 0.0, 1.0],
+        [0.0, 0.0, 1.0],
+    ])
+    k = sandwich_kernel(tp, knots_tp)
+
+    assert np.allclose(k, expected)
@@ -1,7 +1,7 @@
 import pytest
 import numpy as np
 import pandas as pd
-from orbit.utils.knots import get_knot_idx, get_knot_dates
+from orbit.utils.knots import get_knot_idx, get_knot_dates, get_knot_idx_by_dist
 
 
 @pytest.mark.parametrize(
@@ -67,3 +67,16 @@ def test_dates_args(dataset, date_col, knot_dates, knot_idx, request):
 
     assert np.all(knot_idx2 == knot_idx)
     assert np.all(knot_dates2 == knot_dates)
+
+
+@pytest.mark.parametrize("num_of_obs", [10, 101, 365])
+@pytest.mark.parametrize("knot_distance", [1, 7, 2.5, 12.3])
+def test_knot_idx_by_dist(num_of_obs, knot_distance):
+    knot_idx = get_knot_idx_by_dist(num_of_obs, knot_distance)
+    expected = np.round(np.sort(np.arange(num_of_obs - 1, -1, -knot_distance))).astype('int')
+    if 0 not in expected:
+        expected = np.sort(np.append(expected, 0))
+
+    assert np.all(knot_idx == expected)
+    assert knot_idx[0] == 0
+    assert knot_idx[-1] == num_of_obs - 1